@@ -0,0 +1,66 @@
+import random
+import timeit
+
+from project import clean_csv, PARSERS
+
+
+def make_rows(count: int, reject_ratio: float, seed: int = 0) -> list:
+
+    """
+    Builds rows shaped like read_csv output, a reject_ratio share of which clean_csv discards.
+
+    :param count: Number of rows to build
+    :param reject_ratio: Share of rows, between 0 and 1, with one invalid field
+    :param seed: Seed for the random number generator
+    :type count: int
+    :type reject_ratio: float
+    :type seed: int
+    :return: A list of dictionaries mapping headers to row values
+    :rtype: list
+    """
+
+    rng = random.Random(seed)
+    bad_fields = [
+        ("id", "12a"),
+        ("age", "-4"),
+        ("age", "abc"),
+        ("name", "Alex J. Morgan"),
+        ("birthdate", "1996/03/14"),
+        ("birthdate", "03.14.1996"),
+        ("birthdate", "13/01/1999"),
+    ]
+
+    rows = []
+    for i in range(count):
+        row = {
+            "id": str(i + 1),
+            "name": "Alex Morgan",
+            "age": str(rng.randint(1, 120)),
+            "birthdate": f"{rng.randint(1, 12):02}/{rng.randint(1, 28):02}/{rng.randint(1900, 2099)}",
+        }
+        if rng.random() < reject_ratio:
+            field, value = rng.choice(bad_fields)
+            row[field] = value
+        rows.append(row)
+
+    return rows
+
+
+def main():
+
+    """
+    Times clean_csv with each parser on inputs with an increasing share of rejected rows.
+    """
+
+    for reject_ratio in (0.0, 0.5, 0.9):
+        rows = make_rows(50_000, reject_ratio)
+        timings = {}
+        for parser in PARSERS:
+            timings[parser] = min(timeit.repeat(lambda: clean_csv(rows, parser), number=1, repeat=5))
+
+        results = ", ".join(f"{parser} {seconds * 1000:.1f} ms" for parser, seconds in timings.items())
+        print(f"{reject_ratio:.0%} rejected: {results} ({timings['regex'] / timings['fast']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
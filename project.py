@@ -1,27 +1,70 @@
 import csv
+import heapq
+import itertools
+import os
 import sys
 import re
+import tempfile
+from collections.abc import Callable, Iterable
+
+
+# Days in each month indexed by month number, February allows leap days and is checked separately
+DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Maps every accepted "MM/DD/" or "MM-DD-" birthdate prefix, with or without leading zeros, to its ISO "MM-DD" form
+MONTH_DAYS = {
+    f"{month_text}{separator}{day_text}{separator}": f"{month:02}-{day:02}"
+    for month in range(1, 13)
+    for day in range(1, DAYS_IN_MONTH[month] + 1)
+    for month_text in {str(month), f"{month:02}"}
+    for day_text in {str(day), f"{day:02}"}
+    for separator in "/-"
+}
+
+BIRTHDATE_PATTERN = re.compile(r"^(0?[1-9]|1[0-2])[/-](0?[1-9]|[12][0-9]|3[01])[/-](19\d{2}|20\d{2})$")
+#                                     ^ Month ^               ^ Day ^                 ^ Year ^
+
+PARSERS = ("fast", "regex")
+SORT_KEYS = ("name", "birthdate")
+OPTIONS = {"--parser": PARSERS, "--sort-by": SORT_KEYS, "--memory-budget": None}
+
+# Headers of rows produced by clean_csv, in output order
+CLEAN_HEADERS = ("id", "name", "age", "birthdate")
+
+# Most sorted runs merged at once, which keeps the number of open files below common limits
+MERGE_FAN_IN = 64
+
 
 def main():
 
     """
     Orchestrates CSV validation, cleaning, deduplication, and writing.
 
+    Usage: python project.py [--parser fast|regex] [--sort-by name|birthdate] [--memory-budget MB] input.csv output.csv
+
     Exits the program if:
         - If there is not exactly two user-specified command-line arguments
+        - An option is unknown, missing its value, or given an invalid value
+        - The memory budget is not a positive number
         - Input or output file is not a CSV
         - Input file cannot be read
 
     Prints the number of discarded rows, if any.
     """
 
-    if len(sys.argv) > 3:
+    arguments, options = parse_options(sys.argv[1:])
+
+    if len(arguments) > 2:
         sys.exit("Too many arguments")
-    elif len(sys.argv) < 3:
+    elif len(arguments) < 2:
         sys.exit("Too few arguments")
 
-    input_file: str = sys.argv[1]
-    output_file: str = sys.argv[2]
+    input_file: str = arguments[0]
+    output_file: str = arguments[1]
+
+    memory_budget = options.get("--memory-budget", "64")
+    if not (memory_budget.isascii() and memory_budget.isdigit() and int(memory_budget) > 0):
+        sys.exit(f"Memory budget '{memory_budget}' is not a positive number of megabytes")
 
     if not is_csv(input_file):
         sys.exit(f"File '{input_file}' is not a CSV")
@@ -31,14 +74,72 @@ def main():
     if not validate_csv(input_file):
         sys.exit(f"File '{input_file}' was not found")
 
-    contents, malformed_rows_count = read_csv(input_file)
-    clean_contents, unclean_rows_count = clean_csv(contents)
-    deduplicated_rows, duplicate_rows_count = deduplicate_csv(clean_contents)
-    write_csv(deduplicated_rows, output_file)
+    parser = options.get("--parser", "fast")
+
+    # Sorted rows are streamed from the file into the sort, and duplicates are removed while merging
+    if sort_by := options.get("--sort-by"):
+        try:
+            with open(input_file, 'r', newline="") as f:
+                sorted_rows, rows_read = sort_csv(iter_clean(iter_csv(f), parser), sort_by, int(memory_budget) * 1024 * 1024)
+        except ValueError as error:
+            sys.exit(f"Error reading file: {error}")
+
+        discarded_rows_count = rows_read - write_csv(sorted_rows, output_file)
+    else:
+        contents, malformed_rows_count = read_csv(input_file)
+        clean_contents, unclean_rows_count = clean_csv(contents, parser)
+        deduplicated_rows, duplicate_rows_count = deduplicate_csv(clean_contents)
+        write_csv(deduplicated_rows, output_file)
+
+        discarded_rows_count = malformed_rows_count + unclean_rows_count + duplicate_rows_count
 
     # Displays how many rows were dropped, not how, to keep simple for longer CSVs
-    if malformed_rows_count or unclean_rows_count or duplicate_rows_count:
-        print(f"{malformed_rows_count + unclean_rows_count + duplicate_rows_count} discarded row(s)")
+    if discarded_rows_count:
+        print(f"{discarded_rows_count} discarded row(s)")
+
+
+def parse_options(args: list, accepted: dict = OPTIONS) -> tuple:
+
+    """
+    Separates "--option value" pairs from positional command-line arguments.
+
+    :param args: Command-line arguments, excluding the program name
+    :param accepted: Maps option names to their accepted values, or None to accept any value
+    :type args: list
+    :type accepted: dict
+    :raise SystemExit:
+        - If an option is unknown
+        - If an option is missing its value or the value is not accepted
+    :return:
+        - A list of positional arguments
+        - A dictionary mapping option names to values
+    :rtype:
+        - list
+        - dict
+    """
+
+    arguments = []
+    options = {}
+
+    args = iter(args)
+    for arg in args:
+        if not arg.startswith("--"):
+            arguments.append(arg)
+            continue
+
+        if arg not in accepted:
+            sys.exit(f"Unknown option '{arg}'")
+
+        value = next(args, None)
+        if value is None:
+            sys.exit(f"Option '{arg}' requires a value")
+
+        choices = accepted[arg]
+        if choices and value not in choices:
+            sys.exit(f"Option '{arg}' must be one of {list(choices)}")
+        options[arg] = value
+
+    return arguments, options
 
 
 def is_csv(file_name: str) -> bool:
@@ -80,14 +181,7 @@ def read_csv(file: str) -> tuple:
     """
     Reads a CSV file and returns validated and structured row data.
 
-    The first non-empty row is considered as the header row. Headers are:
-        - Stripped of whitespace
-        - Converted to lowercase
-        - Must be non-empty and unique
-
-    Rows are considered malformed and are discarded if they:
-        - Have missing fields or extra fields
-        - Contain empty values
+    See parse_csv for the header and row rules.
 
     :param file: Name of file to read
     :type file: str
@@ -103,61 +197,114 @@ def read_csv(file: str) -> tuple:
         - int
     """
 
-    contents = []
-    headers = []
-
     try:
-        # Scans file and assigns first valid line as headers otherwise the file is empty
         with open(file, 'r', newline="") as f:
-            lines = csv.reader(f)
-            for row in lines:
-                headers = row
-                if headers:
-                    break
-            if headers == []:
-                raise ValueError("File is empty")
-
-
-            # Cleans headers. Exits if header is empty or a duplicate. And displays invalid header location(s) if found
-            clean_headers = []
-            empty_header_locations = []
-            duplicate_headers = []
-            duplicate_header_locations = []
-
-            for i, header in enumerate(headers, start=1):
-                clean_header = header.strip().lower()
-                if clean_header == "":
-                    empty_header_locations.append(i)
-                elif clean_header in clean_headers:
-                    duplicate_header_locations.append(i)
-                    duplicate_headers.append(header)
-                else:
-                    clean_headers.append(clean_header)
-
-            if empty_header_locations:
-                raise ValueError(f"Empty header(s) found at position(s) {empty_header_locations}")
-            elif duplicate_headers:
-                raise ValueError(f"Duplicate header(s) '{duplicate_headers}' found at position(s) {duplicate_header_locations} respectively")
-
-
-            # Malformed rows are rows with empty values or rows with more than columns than headers
-            malformed_contents = []
-
-            for row in lines:
-                if not len(row) == len(clean_headers):
-                    malformed_contents.append(row)
-                elif any(data.strip() == "" for data in row):
-                    malformed_contents.append(row)
-                else:
-                    contents.append(dict(zip(clean_headers, row)))
-
-            return contents, len(malformed_contents)
+            return parse_csv(f)
 
     except ValueError as error:
         sys.exit(f"Error reading file: {error}")
 
 
-def clean_csv(contents: list) -> tuple:
+def parse_csv(f) -> tuple:
+
+    """
+    Parses CSV text and returns validated and structured row data.
+
+    See iter_csv for the header and row rules.
+
+    :param f: An open file, or any iterable of CSV lines such as io.StringIO
+    :raise ValueError:
+        - If the file is empty
+        - If a header is empty
+        - If there is a duplicate header
+    :return:
+        - A list of dictionaries mapping headers to row values.
+        - Count of discarded rows
+    :rtype:
+        - list
+        - int
+    """
+
+    contents = []
+    malformed_rows_count = 0
+
+    for row in iter_csv(f):
+        if row is None:
+            malformed_rows_count += 1
+        else:
+            contents.append(row)
+
+    return contents, malformed_rows_count
+
+
+def iter_csv(f):
+
+    """
+    Parses CSV text one row at a time, yielding None in place of each malformed row.
+
+    The first non-empty row is considered as the header row. Headers are:
+        - Stripped of whitespace
+        - Converted to lowercase
+        - Must be non-empty and unique
+
+    Rows are considered malformed and are discarded if they:
+        - Have missing fields or extra fields
+        - Contain empty values
+
+    :param f: An open file, or any iterable of CSV lines such as io.StringIO
+    :raise ValueError:
+        - If the file is empty
+        - If a header is empty
+        - If there is a duplicate header
+    :return: A generator of dictionaries mapping headers to row values, or None for malformed rows
+    :rtype: generator
+    """
+
+    headers = []
+
+    # Scans file and assigns first valid line as headers otherwise the file is empty
+    lines = csv.reader(f)
+    for row in lines:
+        headers = row
+        if headers:
+            break
+    if headers == []:
+        raise ValueError("File is empty")
+
+
+    # Cleans headers. Raises if header is empty or a duplicate. And displays invalid header location(s) if found
+    clean_headers = []
+    empty_header_locations = []
+    duplicate_headers = []
+    duplicate_header_locations = []
+
+    for i, header in enumerate(headers, start=1):
+        clean_header = header.strip().lower()
+        if clean_header == "":
+            empty_header_locations.append(i)
+        elif clean_header in clean_headers:
+            duplicate_header_locations.append(i)
+            duplicate_headers.append(header)
+        else:
+            clean_headers.append(clean_header)
+
+    if empty_header_locations:
+        raise ValueError(f"Empty header(s) found at position(s) {empty_header_locations}")
+    elif duplicate_headers:
+        raise ValueError(f"Duplicate header(s) '{duplicate_headers}' found at position(s) {duplicate_header_locations} respectively")
+
+
+    # Malformed rows are rows with empty values or rows with more than columns than headers
+    for row in lines:
+        if not len(row) == len(clean_headers):
+            yield None
+        elif any(data.strip() == "" for data in row):
+            yield None
+        else:
+            yield dict(zip(clean_headers, row))
+
+
+def clean_csv(contents: list, parser: str = "fast") -> tuple:
 
     """
     Further validates and normalizes CSV row data.
@@ -176,8 +323,15 @@ def clean_csv(contents: list) -> tuple:
 
     Rows violating any rule are discarded
 
+    The "fast" parser checks fields by hand without raising exceptions and also rejects
+    birthdates that do not exist on the calendar (e.g. 02/31). The "regex" parser is the
+    original regular expression and exception based path.
+
     :param contents: List of dictionaries from read_csv to clean
+    :param parser: Row parser to use, one of PARSERS
     :type contents: list
+    :type parser: str
+    :raise ValueError: If parser is not one of PARSERS
     :return:
         - List of further validated and normalized dictionaries
         - Count of discarded rows
@@ -187,42 +341,175 @@ def clean_csv(contents: list) -> tuple:
     """
 
     clean_contents = []
-    unclean_rows = []
+    unclean_rows_count = 0
 
-    for row in contents:
-        try:
-            clean_id = int(row["id"].strip()) # Checks that IDs have no letters
-            clean_id = row["id"].strip().zfill(3) # IDs are strings and are 3 digits long
-            clean_age = int(row["age"].strip())
-            if clean_age < 1: # Ages zero or below are NOT allowed
-                raise ValueError
-            elif clean_age > 120: # Ages above 120 years are NOT allowed
-                raise ValueError
+    for clean in iter_clean(contents, parser):
+        if clean is None:
+            unclean_rows_count += 1
+        else:
+            clean_contents.append(clean)
+
+    return clean_contents, unclean_rows_count
+
+
+def iter_clean(contents: Iterable, parser: str = "fast"):
+
+    """
+    Cleans rows one at a time, yielding None in place of each row that violates a rule.
+
+    See clean_csv for the rules. None rows from iter_csv are passed through as None.
+
+    :param contents: Iterable of dictionaries, or None, from iter_csv or read_csv to clean
+    :param parser: Row parser to use, one of PARSERS
+    :type contents: Iterable
+    :type parser: str
+    :raise ValueError: If parser is not one of PARSERS
+    :return: A generator of normalized dictionaries, or None for discarded rows
+    :rtype: generator
+    """
+
+    if parser == "fast":
+        clean_row = clean_row_fast
+    elif parser == "regex":
+        clean_row = clean_row_regex
+    else:
+        raise ValueError(f"Unknown parser '{parser}', expected one of {list(PARSERS)}")
+
+    return (None if row is None else clean_row(row) for row in contents)
+
+
+def clean_row_fast(row: dict) -> dict | None:
+
+    """
+    Validates and normalizes a single row without raising exceptions.
+
+    :param row: Dictionary from read_csv to clean
+    :type row: dict
+    :return: The normalized row, or None if the row violates any rule
+    :rtype: dict | None
+    """
+
+    # IDs and ages must be made only of ASCII digits, no signs, spaces or letters
+    clean_id = row["id"].strip()
+    if not (clean_id.isascii() and clean_id.isdigit()):
+        return None
+
+    clean_age = row["age"].strip()
+    if not (clean_age.isascii() and clean_age.isdigit()):
+        return None
+    clean_age = int(clean_age)
+    if not 1 <= clean_age <= 120:
+        return None
+
+    clean_name = parse_name(row["name"])
+    if clean_name is None:
+        return None
+
+    clean_birthdate = parse_birthdate(row["birthdate"].strip())
+    if clean_birthdate is None:
+        return None
+
+    return {"id": clean_id.zfill(3), "name": clean_name, "age": clean_age, "birthdate": clean_birthdate}
+
+
+def clean_row_regex(row: dict) -> dict | None:
+
+    """
+    Validates and normalizes a single row using int() and BIRTHDATE_PATTERN.
+
+    :param row: Dictionary from read_csv to clean
+    :type row: dict
+    :return: The normalized row, or None if the row violates any rule
+    :rtype: dict | None
+    """
+
+    try:
+        clean_id = int(row["id"].strip()) # Checks that IDs have no letters
+        clean_id = row["id"].strip().zfill(3) # IDs are strings and are 3 digits long
+        clean_age = int(row["age"].strip())
+        if clean_age < 1: # Ages zero or below are NOT allowed
+            raise ValueError
+        elif clean_age > 120: # Ages above 120 years are NOT allowed
+            raise ValueError
+
+        # Names with middle names are NOT allowed
+        if "," in row["name"]: # Detects names formatted as "Last, First"
+            last, first = row["name"].replace(",", "").split()
+            clean_name = f"{last}, {first}".title()
+        else:
+            first, last = row["name"].split()
+            clean_name = f"{last}, {first}".title()
+
+        # Rejects birthdates BEFORE 1900. Accepts birthdates formatted as "MM/DD/YYYY" or "MM-DD-YYYY"
+        if matches := BIRTHDATE_PATTERN.search(row["birthdate"].strip()):
+            clean_birthdate = f"{matches[3]}-{matches[1].zfill(2)}-{matches[2].zfill(2)}" # Formats using ISO: "YYYY/MM/DD"
+        else:
+            raise ValueError
 
-            # Names with middle names are NOT allowed
-            if "," in row["name"]: # Detects names formatted as "Last, First"
-                last, first = row["name"].replace(",", "").split()
-                clean_name = f"{last}, {first}".title()
-            else:
-                first, last = row["name"].split()
-                clean_name = f"{last}, {first}".title()
+        return {"id": clean_id, "name": clean_name, "age": clean_age, "birthdate": clean_birthdate}
 
-            if matches := re.search(r"^(0?[1-9]|1[0-2])[/-](0?[1-9]|[12][0-9]|3[01])[/-](19\d{2}|20\d{2})$", row["birthdate"].strip()):
-                #                         ^ Month ^               ^ Day ^                 ^ Year ^
-                # Rejects birthdates BEFORE 1900. Accepts birthdates formatted as "MM/DD/YYYY" or "MM-DD-YYYY"
-                clean_birthdate = f"{matches[3]}-{matches[1]:02}-{matches[2]:02}" # Formats using ISO: "YYYY/MM/DD"
-            else:
-                raise ValueError
+    except ValueError:
+        return None
+
+
+def parse_name(value: str) -> str | None:
+
+    """
+    Normalizes a "First Last" or "Last, First" name to "Last, First".
+
+    :param value: Name to normalize
+    :type value: str
+    :return: The normalized name, or None if the name is not exactly two words
+    :rtype: str | None
+    """
 
-            clean_contents.append({"id": clean_id, "name": clean_name, "age": clean_age, "birthdate": clean_birthdate})
+    # Names with middle names are NOT allowed
+    parts = value.replace(",", "").split()
+    if len(parts) != 2:
+        return None
 
-        except ValueError:
-            unclean_rows.append(row)
+    if "," in value: # Detects names formatted as "Last, First"
+        last, first = parts
+    else:
+        first, last = parts
 
-    return clean_contents, len(unclean_rows)
+    return f"{last}, {first}".title()
 
 
-def deduplicate_csv(clean_contents: list) -> tuple:
+def parse_birthdate(value: str) -> str | None:
+
+    """
+    Converts a MM/DD/YYYY or MM-DD-YYYY birthdate to ISO format "YYYY-MM-DD".
+
+    Months and days may be one or two digits, both separators must match, the year
+    must be between 1900 and 2099, and the day must exist in that month and year.
+
+    :param value: Birthdate to convert
+    :type value: str
+    :return: The ISO formatted birthdate, or None if the birthdate is invalid
+    :rtype: str | None
+    """
+
+    # The prefix lookup checks the month, the day, the month's length and that both separators match
+    month_day = MONTH_DAYS.get(value[:-4])
+    if month_day is None:
+        return None
+
+    # Four ASCII digits compare as strings in the same order as their values
+    year_text = value[-4:]
+    if not (year_text.isascii() and year_text.isdigit() and "1900" <= year_text <= "2099"):
+        return None
+
+    # February 29th only exists in leap years
+    if month_day == "02-29":
+        year = int(year_text)
+        if not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+            return None
+
+    return f"{year_text}-{month_day}"
+
+
+def deduplicate_csv(clean_contents: list, seen_people: set | None = None) -> tuple:
 
     """
     Removes duplicate rows from CSV file.
@@ -230,8 +517,12 @@ def deduplicate_csv(clean_contents: list) -> tuple:
     Two rows are duplicates if name, age, and birthdate key-value pairs match exactly.
     Original row order is preserved.
 
+    Passing the same seen_people set to several calls also discards rows seen by earlier calls.
+
     :param clean_contents: List of dictionaries from clean_csv to deduplicate
+    :param seen_people: (name, age, birthdate) keys already seen, updated in place
     :type clean_contents: list
+    :type seen_people: set | None
     :return:
         1. A list of deduplicated dictionaries
         2. Count of discarded rows
@@ -242,7 +533,8 @@ def deduplicate_csv(clean_contents: list) -> tuple:
 
     deduplicated_contents = []
     malformed_rows = []
-    seen_people = set()
+    if seen_people is None:
+        seen_people = set()
 
     for row in clean_contents:
         person_key = (row["name"], row["age"], row["birthdate"])
@@ -259,21 +551,214 @@ def deduplicate_csv(clean_contents: list) -> tuple:
     return deduplicated_contents, len(malformed_rows)
 
 
-def write_csv(deduplicated_contents: list, output_file: str):
+def sort_csv(rows: Iterable, sort_by: str, memory_budget: int = 64 * 1024 * 1024) -> tuple:
+
+    """
+    Sorts and deduplicates cleaned rows with an external merge sort.
+
+    Rows are read from rows into runs of about memory_budget bytes. Each full run is sorted
+    and written to a temporary file before the next run is read, so only one run is held in
+    memory. Runs are then merged, at most MERGE_FAN_IN at a time, until few enough are left to
+    merge into the output. If every row fits in one run, nothing is written to disk.
+
+    Rows are ordered by sort_by, then by name, age, and birthdate, so duplicate rows are next
+    to each other and only the first of them is kept. IDs are renumbered after sorting.
+
+    All rows are read before this returns. The sorted rows are merged as they are consumed,
+    and the temporary files are removed once the generator is finished or closed.
+
+    :param rows: Iterable of dictionaries from iter_clean or clean_csv, None items are discarded rows
+    :param sort_by: Field to sort by, one of SORT_KEYS
+    :param memory_budget: Approximate number of bytes of rows to hold in memory at once
+    :type rows: Iterable
+    :type sort_by: str
+    :type memory_budget: int
+    :raise ValueError:
+        - If sort_by is not one of SORT_KEYS
+        - If reading rows raises ValueError
+    :return:
+        - A generator of sorted and deduplicated dictionaries
+        - Count of items read from rows, including discarded rows
+    :rtype:
+        - generator
+        - int
+    """
+
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key '{sort_by}', expected one of {list(SORT_KEYS)}")
+
+    def sort_key(row: dict) -> tuple:
+        return (row[sort_by], row["name"], row["age"], row["birthdate"])
+
+    directory = tempfile.TemporaryDirectory()
+    run_numbers = itertools.count()
+    run_files = []
+    run = []
+    run_size = 0
+    rows_read = 0
+
+    try:
+        for row in rows:
+            rows_read += 1
+            if row is None:
+                continue
+
+            run.append(row)
+            run_size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+            if run_size >= memory_budget:
+                run.sort(key=sort_key)
+                run_files.append(write_run(run, directory.name, next(run_numbers)))
+                run = []
+                run_size = 0
+
+        run.sort(key=sort_key)
+        if run_files:
+            if run:
+                run_files.append(write_run(run, directory.name, next(run_numbers)))
+                run = []
+
+            # Merges groups of runs into longer runs until they can all be open at once
+            while len(run_files) > MERGE_FAN_IN:
+                run_files = [
+                    merge_runs(run_files[i:i + MERGE_FAN_IN], sort_key, directory.name, next(run_numbers))
+                    for i in range(0, len(run_files), MERGE_FAN_IN)
+                ]
+
+    except BaseException:
+        directory.cleanup()
+        raise
+
+    return deduplicate_sorted(run, run_files, sort_key, directory), rows_read
+
+
+def deduplicate_sorted(run: list, run_files: list, sort_key: Callable, directory: tempfile.TemporaryDirectory):
+
+    """
+    Merges sorted runs, drops adjacent duplicates, and renumbers IDs. The generator behind sort_csv.
+
+    :param run: Sorted dictionaries kept in memory, used only when run_files is empty
+    :param run_files: Names of sorted run files to merge
+    :param sort_key: Function giving the order rows were sorted in
+    :param directory: Temporary directory holding run_files, removed when the generator finishes
+    :type run: list
+    :type run_files: list
+    :type sort_key: Callable
+    :type directory: tempfile.TemporaryDirectory
+    :return: A generator of sorted and deduplicated dictionaries
+    :rtype: generator
+    """
+
+    try:
+        if run_files:
+            sorted_rows = heapq.merge(*(read_run(run_file) for run_file in run_files), key=sort_key)
+        else:
+            sorted_rows = run
+
+        previous_key = None
+        index = 0
+
+        for row in sorted_rows:
+            person_key = (row["name"], row["age"], row["birthdate"])
+            if person_key == previous_key:
+                continue
+
+            previous_key = person_key
+            index += 1
+            row["id"] = f"{index:03}"
+            yield row
+
+    finally:
+        directory.cleanup()
+
+
+def merge_runs(run_files: list, sort_key: Callable, directory: str, number: int) -> str:
+
+    """
+    Merges sorted run files into one longer sorted run file and removes the merged files.
+
+    :param run_files: Names of sorted run files to merge
+    :param sort_key: Function giving the order rows were sorted in
+    :param directory: Directory to write the merged run to
+    :param number: Number used to name the merged run file
+    :type run_files: list
+    :type sort_key: Callable
+    :type directory: str
+    :type number: int
+    :return: Name of the merged run file
+    :rtype: str
+    """
+
+    merged_file = write_run(heapq.merge(*(read_run(run_file) for run_file in run_files), key=sort_key), directory, number)
+
+    for run_file in run_files:
+        os.remove(run_file)
+
+    return merged_file
+
+
+def write_run(rows: Iterable, directory: str, number: int) -> str:
+
+    """
+    Writes already sorted rows to a run file in directory.
+
+    :param rows: Sorted dictionaries with CLEAN_HEADERS keys
+    :param directory: Directory to write the run to
+    :param number: Number used to name the run file
+    :type rows: Iterable
+    :type directory: str
+    :type number: int
+    :return: Name of the written file
+    :rtype: str
+    """
+
+    run_file = os.path.join(directory, f"run{number}.csv")
+
+    with open(run_file, 'w', newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CLEAN_HEADERS)
+        writer.writerows(rows)
+
+    return run_file
+
+
+def read_run(run_file: str):
+
+    """
+    Reads rows written by write_run one at a time, with ages converted back to integers.
+
+    :param run_file: Name of the run file to read
+    :type run_file: str
+    :return: A generator of dictionaries with CLEAN_HEADERS keys
+    :rtype: generator
+    """
+
+    with open(run_file, 'r', newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f, fieldnames=CLEAN_HEADERS):
+            row["age"] = int(row["age"])
+            yield row
+
+
+def write_csv(deduplicated_contents: Iterable, output_file: str) -> int:
 
     """
     Writes cleaned and deduplicated CSV data to an user-specified output file.
 
-    :param deduplicated_contents: List of dictionaries from deduplicate_csv to write
+    :param deduplicated_contents: Dictionaries to write, a list from deduplicate_csv or the generator from sort_csv
     :param output_file: Name of the file to write clean and deduplicated to
-    :type deduplicated_contents: list
+    :type deduplicated_contents: Iterable
     :type output_file: str
     :raise SystemExit:
         - ValueError: Error occurred while writing output file
         - IndexError: No rows left to write after clean_csv and deduplicate_csv
+    :return: Count of rows written
+    :rtype: int
     """
     try:
-        keys = deduplicated_contents[0].keys()
+        rows = iter(deduplicated_contents)
+        first_row = next(rows, None)
+        if first_row is None:
+            raise IndexError
+
+        keys = first_row.keys()
         headers = []
         for key in keys:
             headers.append(key)
@@ -282,8 +767,13 @@ def write_csv(deduplicated_contents: list, output_file: str):
             writer = csv.DictWriter(f, fieldnames=headers)
 
             writer.writeheader()
-            for row in deduplicated_contents:
+            writer.writerow(first_row)
+            rows_written = 1
+            for row in rows:
                 writer.writerow(row)
+                rows_written += 1
+
+        return rows_written
 
     except ValueError:
         sys.exit(f"Error writing to file '{output_file}'")
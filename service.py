@@ -0,0 +1,401 @@
+import asyncio
+import csv
+import io
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from project import CLEAN_HEADERS, PARSERS, clean_csv, deduplicate_csv, is_csv, parse_csv, parse_options
+
+
+SERVICE_OPTIONS = {
+    "--host": None,
+    "--port": None,
+    "--socket": None,
+    "--workers": None,
+    "--dedup": ("request", "shared"),
+    "--root": None,
+    "--max-body": None,
+}
+
+# Rows encoded and sent per HTTP chunk while streaming a response
+CHUNK_ROWS = 1000
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Content Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+def main():
+
+    """
+    Runs the cleaner as a long-running HTTP service.
+
+    Usage: python service.py [--host HOST] [--port PORT | --socket PATH] [--workers N] [--dedup request|shared]
+                             [--root DIR] [--max-body MB]
+
+    Exits the program if:
+        - Any positional command-line argument is given
+        - An option is unknown, missing its value, or given an invalid value
+    """
+
+    arguments, options = parse_options(sys.argv[1:], SERVICE_OPTIONS)
+
+    if arguments:
+        sys.exit("Too many arguments")
+
+    port = options.get("--port", "8080")
+    workers = options.get("--workers", "4")
+    max_body = options.get("--max-body", "64")
+    root = options.get("--root")
+    if not (port.isascii() and port.isdigit()):
+        sys.exit(f"Port '{port}' is not a number")
+    elif not (workers.isascii() and workers.isdigit() and int(workers) > 0):
+        sys.exit(f"Workers '{workers}' is not a positive number")
+    elif not (max_body.isascii() and max_body.isdigit() and int(max_body) > 0):
+        sys.exit(f"Maximum body size '{max_body}' is not a positive number of megabytes")
+    elif root is not None and not os.path.isdir(root):
+        sys.exit(f"Root '{root}' is not a directory")
+
+    service = Service(int(workers), options.get("--dedup") == "shared", root, int(max_body) * 1024 * 1024)
+    try:
+        asyncio.run(service.serve(options.get("--host", "127.0.0.1"), int(port), options.get("--socket")))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown()
+
+
+class Service:
+
+    """
+    Serves POST /clean requests, keeping state warm between requests.
+
+    The request body is the CSV to clean, or with ?path=file.csv a CSV file inside the root
+    directory is read instead. ?parser= selects the row parser (see clean_csv). The cleaned CSV
+    is streamed back with the number of discarded rows in the X-Discarded-Rows header.
+
+    Requests are read and cleaned on a pool of worker processes so several can be cleaned at
+    the same time. Deduplication runs in this process so the shared index can be kept here. Any
+    error is returned to the client as a plain text response instead of stopping the service.
+
+    :param workers: Number of processes cleaning requests at the same time
+    :param shared_dedup: If True, rows seen by earlier requests are discarded as duplicates
+    :param root: Directory ?path= files must be inside, or None to refuse ?path=
+    :param max_body: Largest request body accepted, in bytes
+    :type workers: int
+    :type shared_dedup: bool
+    :type root: str | None
+    :type max_body: int
+    """
+
+    def __init__(self, workers: int, shared_dedup: bool = False, root: str | None = None, max_body: int = 64 * 1024 * 1024):
+        self.workers = workers
+        self.executor = self.start_executor()
+        self.seen_people = set() if shared_dedup else None
+        self.dedup_lock = threading.Lock()
+        self.root = os.path.realpath(root) if root is not None else None
+        self.max_body = max_body
+
+    def start_executor(self) -> ProcessPoolExecutor:
+
+        """
+        Starts a new pool of worker processes.
+        """
+
+        # Spawned workers do not inherit open client sockets, which would keep connections open after a response
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def replace_executor(self, broken: ProcessPoolExecutor):
+
+        """
+        Replaces a pool that lost a worker process, unless another request already replaced it.
+
+        :param broken: The pool that raised BrokenProcessPool
+        :type broken: ProcessPoolExecutor
+        """
+
+        # Runs on the event loop thread, so checking and replacing cannot be interleaved with another request
+        if self.executor is broken:
+            print("Worker process died, starting a new pool", file=sys.stderr)
+            self.executor = self.start_executor()
+            broken.shutdown(wait=False)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, socket_path: str | None = None):
+
+        """
+        Listens on a local TCP port, or on a Unix socket if socket_path is given, until cancelled.
+        """
+
+        if socket_path:
+            server = await asyncio.start_unix_server(self.handle, path=socket_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+
+        """
+        Reads one HTTP request from the connection, cleans it, and writes the response.
+        """
+
+        try:
+            status, rows, discarded = await self.respond(reader, writer)
+            if status == 200:
+                await send_rows(writer, rows, discarded)
+            else:
+                await send_text(writer, status, rows)
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # Client went away, nothing left to send
+
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def respond(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> tuple:
+
+        """
+        Parses an HTTP request and cleans its CSV.
+
+        The writer is only used to send "100 Continue" to clients that wait for it before the body.
+
+        :return:
+            - HTTP status code
+            - Cleaned rows if the status is 200, otherwise an error message
+            - Count of discarded rows
+        :rtype:
+            - int
+            - list | str
+            - int
+        """
+
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            url = urlsplit(target)
+            if url.path != "/clean":
+                return 404, f"Unknown path '{url.path}'", 0
+            elif method != "POST":
+                return 405, f"Method '{method}' is not allowed, use POST", 0
+
+            if "transfer-encoding" in headers:
+                return 411, "Error: chunked uploads are not supported, send a Content-Length", 0
+
+            length = int(headers.get("content-length", "0"))
+            if length > self.max_body:
+                return 413, f"Error: body is larger than {self.max_body} bytes", 0
+
+            # Clients such as curl wait up to a second for this before sending large bodies
+            if headers.get("expect", "").lower() == "100-continue":
+                writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                await writer.drain()
+
+            body = await reader.readexactly(length)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+            rows, discarded = await self.clean(body, query)
+            return 200, rows, discarded
+
+        except asyncio.IncompleteReadError:
+            raise
+        except PermissionError as error:
+            return 403, f"Error: {error}", 0
+        except BrokenProcessPool:
+            return 503, "Error: worker process died while cleaning, try again", 0
+        except ValueError as error:
+            return 400, f"Error: {error}", 0
+        except Exception as error:
+            print(f"Error handling request: {error!r}", file=sys.stderr)
+            return 500, "Error: internal error while cleaning", 0
+
+    async def clean(self, body: bytes, query: dict) -> tuple:
+
+        """
+        Cleans a request on the worker processes, then deduplicates it.
+
+        :param body: Request body holding CSV text, ignored if query has a path
+        :param query: Query parameters, "path" and "parser" are used
+        :type body: bytes
+        :type query: dict
+        :raise PermissionError: If a path is given but no root is set or the path is outside it
+        :raise BrokenProcessPool: If a worker process died while cleaning the request twice
+        :raise ValueError:
+            - If the parser or path is invalid or the file cannot be read
+            - If the CSV is empty or has invalid headers
+            - If no rows are left after cleaning and deduplicating
+        :return:
+            - A list of cleaned and deduplicated dictionaries
+            - Count of discarded rows
+        :rtype:
+            - list
+            - int
+        """
+
+        parser = query.get("parser", "fast")
+        if parser not in PARSERS:
+            raise ValueError(f"Parser '{parser}' must be one of {list(PARSERS)}")
+
+        path = query.get("path")
+        if path is not None:
+            if self.root is None:
+                raise PermissionError("Reading files by path is disabled, start the service with --root")
+            path = os.path.realpath(os.path.join(self.root, path))
+            if os.path.commonpath([self.root, path]) != self.root:
+                raise PermissionError(f"File '{query['path']}' is outside the root directory")
+
+        # A worker that dies breaks the whole pool, so the pool is replaced and the request tried once more
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                clean_contents, discarded = await loop.run_in_executor(executor, clean_request, body, path, parser)
+                break
+            except BrokenProcessPool:
+                self.replace_executor(executor)
+                if attempt:
+                    raise
+        deduplicated_rows, duplicate_rows_count = await loop.run_in_executor(None, self.deduplicate, clean_contents)
+
+        if not deduplicated_rows:
+            raise ValueError("No rows left after cleaning and deduplicating")
+
+        return deduplicated_rows, discarded + duplicate_rows_count
+
+    def deduplicate(self, clean_contents: list) -> tuple:
+
+        """
+        Runs deduplicate_csv, against the shared index if there is one.
+
+        :param clean_contents: List of dictionaries from clean_request to deduplicate
+        :type clean_contents: list
+        :return:
+            - A list of deduplicated dictionaries
+            - Count of discarded rows
+        :rtype:
+            - list
+            - int
+        """
+
+        if self.seen_people is None:
+            return deduplicate_csv(clean_contents)
+
+        with self.dedup_lock:
+            return deduplicate_csv(clean_contents, self.seen_people)
+
+
+def clean_request(body: bytes, path: str | None, parser: str) -> tuple:
+
+    """
+    Reads and cleans the CSV of one request. Runs in a worker process.
+
+    :param body: Request body holding CSV text, ignored if path is given
+    :param path: Name of a CSV file to read instead of body, already checked against the root
+    :param parser: Row parser to use, one of PARSERS
+    :type body: bytes
+    :type path: str | None
+    :type parser: str
+    :raise ValueError:
+        - If the path is not a CSV or cannot be read
+        - If the CSV is empty or has invalid headers
+        - If the CSV is missing an id, name, age, or birthdate column
+    :return:
+        - List of cleaned dictionaries
+        - Count of discarded rows
+    :rtype:
+        - list
+        - int
+    """
+
+    if path is not None:
+        if not is_csv(path):
+            raise ValueError(f"File '{os.path.basename(path)}' is not a CSV")
+        try:
+            with open(path, 'r', newline="") as f:
+                contents, malformed_rows_count = parse_csv(f)
+        except OSError:
+            raise ValueError(f"File '{os.path.basename(path)}' could not be read")
+    else:
+        contents, malformed_rows_count = parse_csv(io.StringIO(body.decode("utf-8"), newline=""))
+
+    # Missing columns are the client's mistake, not a KeyError while cleaning
+    if contents:
+        missing_headers = [header for header in CLEAN_HEADERS if header not in contents[0]]
+        if missing_headers:
+            raise ValueError(f"Missing column(s) {missing_headers}")
+
+    clean_contents, unclean_rows_count = clean_csv(contents, parser)
+
+    return clean_contents, malformed_rows_count + unclean_rows_count
+
+
+async def send_rows(writer: asyncio.StreamWriter, rows: list, discarded: int):
+
+    """
+    Streams rows back as a chunked CSV response, CHUNK_ROWS rows at a time.
+    """
+
+    writer.write(
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: text/csv; charset=utf-8\r\n"
+        "Transfer-Encoding: chunked\r\n"
+        f"X-Discarded-Rows: {discarded}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1")
+    )
+
+    headers = list(rows[0].keys())
+    for start in range(0, len(rows), CHUNK_ROWS):
+        buffer = io.StringIO()
+        csv_writer = csv.DictWriter(buffer, fieldnames=headers)
+        if start == 0:
+            csv_writer.writeheader()
+        csv_writer.writerows(rows[start:start + CHUNK_ROWS])
+
+        data = buffer.getvalue().encode("utf-8")
+        writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+        await writer.drain()
+
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def send_text(writer: asyncio.StreamWriter, status: int, message: str):
+
+    """
+    Sends a plain text response, used for errors.
+    """
+
+    data = f"{message}\n".encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        "Content-Type: text/plain; charset=utf-8\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1") + data
+    )
+    await writer.drain()
+
+
+if __name__ == "__main__":
+    main()
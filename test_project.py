@@ -1,6 +1,8 @@
-from final_project import is_csv, validate_csv, read_csv, clean_csv, deduplicate_csv, write_csv
+from final_project import is_csv, validate_csv, read_csv, clean_csv, deduplicate_csv, write_csv, parse_options, parse_name, parse_birthdate, parse_csv, sort_csv, main
 import pytest
 import csv
+import io
+import sys
 
 def test_is_csv():
 
@@ -10,6 +12,27 @@ def test_is_csv():
     assert is_csv("csv") == False
 
 
+def test_parse_options():
+
+    # Options are separated from positional arguments
+    arguments, options = parse_options(["in.csv", "--parser", "regex", "out.csv"])
+
+    assert arguments == ["in.csv", "out.csv"]
+    assert options == {"--parser": "regex"}
+
+    # Unknown option
+    with pytest.raises(SystemExit):
+        parse_options(["in.csv", "out.csv", "--fast"])
+
+    # Option missing its value
+    with pytest.raises(SystemExit):
+        parse_options(["in.csv", "out.csv", "--parser"])
+
+    # Option with an invalid value
+    with pytest.raises(SystemExit):
+        parse_options(["in.csv", "out.csv", "--parser", "slow"])
+
+
 def test_validate_csv(tmp_path):
 
     # Valid CSV
@@ -131,6 +154,23 @@ def test_read_csv(tmp_path):
     assert malformed_row_count == 0
 
 
+def test_parse_csv():
+
+    # CSV text that is not in a file
+    contents, malformed_row_count = parse_csv(io.StringIO(
+        "header1,header2\n"
+        "value1,value2\n"
+        "value3\n"
+    ))
+
+    assert contents == [{"header1": "value1", "header2": "value2"}]
+    assert malformed_row_count == 1
+
+    # Errors are raised instead of exiting
+    with pytest.raises(ValueError):
+        parse_csv(io.StringIO(""))
+
+
 def test_clean_csv(tmp_path):
 
     # CSV with single digit IDs
@@ -326,6 +366,93 @@ def test_clean_csv(tmp_path):
     assert malformed_row_count == 2
 
 
+    # CSV with birthdates that do not exist on the calendar
+    contents = [
+        {"id": "001", "name": "Alex Morgan", "age": "29", "birthdate": "02/31/1996"},
+        {"id": "002", "name": "Patel, Jamie", "age": "41", "birthdate": "02/29/1900"},
+        {"id": "003", "name": "Nguyen, Chris", "age": "22", "birthdate": "02/29/2004"}
+    ]
+
+    clean_contents, malformed_row_count = clean_csv(contents)
+
+    assert clean_contents == [
+        {"id": "003", "name": "Nguyen, Chris", "age": 22, "birthdate": "2004-02-29"}
+    ]
+    assert malformed_row_count == 2
+
+    # CSV with signs in IDs and ages, only the regex parser accepts them
+    contents = [
+        {"id": "+1", "name": "Alex Morgan", "age": "29", "birthdate": "03/14/1996"},
+        {"id": "002", "name": "Patel, Jamie", "age": "+41", "birthdate": "11/02/1984"},
+        {"id": "003", "name": "Nguyen, Chris", "age": "22", "birthdate": "07/19/2003"}
+    ]
+
+    clean_contents, malformed_row_count = clean_csv(contents)
+
+    assert clean_contents == [
+        {"id": "003", "name": "Nguyen, Chris", "age": 22, "birthdate": "2003-07-19"}
+    ]
+    assert malformed_row_count == 2
+
+    clean_contents, malformed_row_count = clean_csv(contents, "regex")
+
+    assert len(clean_contents) == 3
+    assert malformed_row_count == 0
+
+    # CSV with one digit months and days and mixed separators, only the regex parser accepts mixed separators
+    contents = [
+        {"id": "001", "name": "Alex Morgan", "age": "29", "birthdate": "1/5/1990"},
+        {"id": "002", "name": "Patel, Jamie", "age": "41", "birthdate": "03/14-1996"}
+    ]
+
+    clean_contents, malformed_row_count = clean_csv(contents)
+
+    assert clean_contents == [
+        {"id": "001", "name": "Morgan, Alex", "age": 29, "birthdate": "1990-01-05"}
+    ]
+    assert malformed_row_count == 1
+
+    clean_contents, malformed_row_count = clean_csv(contents, "regex")
+
+    assert clean_contents == [
+        {"id": "001", "name": "Morgan, Alex", "age": 29, "birthdate": "1990-01-05"},
+        {"id": "002", "name": "Patel, Jamie", "age": 41, "birthdate": "1996-03-14"}
+    ]
+    assert malformed_row_count == 0
+
+    # Unknown parser
+    with pytest.raises(ValueError):
+        clean_csv(contents, "slow")
+
+
+def test_parse_name():
+
+    assert parse_name("Alex Morgan") == "Morgan, Alex"
+    assert parse_name("  pATeL,   jAMie  ") == "Patel, Jamie"
+    assert parse_name("Alex J. Morgan") == None
+    assert parse_name("Alex") == None
+
+
+def test_parse_birthdate():
+
+    # Valid birthdates
+    assert parse_birthdate("03/14/1996") == "1996-03-14"
+    assert parse_birthdate("3-4-1996") == "1996-03-04"
+    assert parse_birthdate("02/29/2000") == "2000-02-29"
+    assert parse_birthdate("12/31/2099") == "2099-12-31"
+
+    # Invalid birthdates
+    assert parse_birthdate("3-4/1996") == None
+    assert parse_birthdate("04/31/1996") == None
+    assert parse_birthdate("02/29/2001") == None
+    assert parse_birthdate("13/01/2000") == None
+    assert parse_birthdate("01/01/1899") == None
+    assert parse_birthdate("01/01/2100") == None
+    assert parse_birthdate("01/01/19a9") == None
+    assert parse_birthdate("01/01/19999") == None
+    assert parse_birthdate("") == None
+
+
 def test_deduplicate_csv():
 
     # CSV with one duplicate
@@ -366,6 +493,147 @@ def test_deduplicate_csv():
     ]
     assert duplicate_row_count == 4
 
+    # Shared set of people seen by an earlier call
+    seen_people = {("Morgan, Alex", 29, "1996-03-14")}
+    clean_contents = [
+        {"id": "001", "name": "Morgan, Alex", "age": 29, "birthdate": "1996-03-14"},
+        {"id": "002", "name": "Patel, Jamie", "age": 41, "birthdate": "1984-11-02"},
+    ]
+
+    deduplicated_contents, duplicate_row_count = deduplicate_csv(clean_contents, seen_people)
+
+    assert deduplicated_contents == [
+        {"id": "001", "name": "Patel, Jamie", "age": 41, "birthdate": "1984-11-02"},
+    ]
+    assert duplicate_row_count == 1
+    assert ("Patel, Jamie", 41, "1984-11-02") in seen_people
+
+
+def test_sort_csv():
+
+    clean_contents = [
+        {"id": "001", "name": "Patel, Jamie", "age": 41, "birthdate": "1984-11-02"},
+        {"id": "002", "name": "Morgan, Alex", "age": 29, "birthdate": "1996-03-14"},
+        None,
+        {"id": "003", "name": "Nguyen, Chris", "age": 22, "birthdate": "2003-07-19"},
+        {"id": "004", "name": "Morgan, Alex", "age": 29, "birthdate": "1996-03-14"},
+        {"id": "005", "name": "Garcia, Elena", "age": 35, "birthdate": "1989-06-01"},
+        {"id": "006", "name": "Patel, Jamie", "age": 41, "birthdate": "1984-11-02"},
+    ]
+
+    sorted_by_name = [
+        {"id": "001", "name": "Garcia, Elena", "age": 35, "birthdate": "1989-06-01"},
+        {"id": "002", "name": "Morgan, Alex", "age": 29, "birthdate": "1996-03-14"},
+        {"id": "003", "name": "Nguyen, Chris", "age": 22, "birthdate": "2003-07-19"},
+        {"id": "004", "name": "Patel, Jamie", "age": 41, "birthdate": "1984-11-02"},
+    ]
+
+    # Sorted in memory, discarded rows are counted as read
+    sorted_rows, rows_read = sort_csv([row and dict(row) for row in clean_contents], "name")
+
+    assert list(sorted_rows) == sorted_by_name
+    assert rows_read == 7
+
+    # Sorted with every row spilled to its own run
+    sorted_rows, rows_read = sort_csv([row and dict(row) for row in clean_contents], "name", memory_budget=1)
+
+    assert list(sorted_rows) == sorted_by_name
+
+    # Sorted by birthdate over several runs
+    sorted_rows, rows_read = sort_csv([row and dict(row) for row in clean_contents], "birthdate", memory_budget=1000)
+
+    assert list(sorted_rows) == [
+        {"id": "001", "name": "Patel, Jamie", "age": 41, "birthdate": "1984-11-02"},
+        {"id": "002", "name": "Garcia, Elena", "age": 35, "birthdate": "1989-06-01"},
+        {"id": "003", "name": "Morgan, Alex", "age": 29, "birthdate": "1996-03-14"},
+        {"id": "004", "name": "Nguyen, Chris", "age": 22, "birthdate": "2003-07-19"},
+    ]
+
+    # Unknown sort key
+    with pytest.raises(ValueError):
+        sort_csv(clean_contents, "age")
+
+
+def test_sort_csv_memory_budget():
+
+    # Counts how many input rows are alive at once
+    class TrackedRow(dict):
+        alive = 0
+        peak = 0
+
+        def __init__(self, *args):
+            super().__init__(*args)
+            TrackedRow.alive += 1
+            TrackedRow.peak = max(TrackedRow.peak, TrackedRow.alive)
+
+        def __del__(self):
+            TrackedRow.alive -= 1
+
+    def rows():
+        for i in range(1000):
+            yield TrackedRow({"id": f"{i:03}", "name": f"Person{i % 500:03}, Alex", "age": 30, "birthdate": "1990-01-01"})
+
+    row_size = sys.getsizeof(TrackedRow()) + 4 * 80
+    sorted_rows, rows_read = sort_csv(rows(), "name", memory_budget=10 * row_size)
+    sorted_rows = list(sorted_rows)
+
+    assert rows_read == 1000
+    assert len(sorted_rows) == 500
+    assert sorted_rows[0]["name"] == "Person000, Alex"
+    assert sorted_rows[-1]["id"] == "500"
+    assert TrackedRow.peak <= 12
+
+
+def test_sort_csv_open_files():
+
+    resource = pytest.importorskip("resource")
+
+    clean_contents = [
+        {"id": f"{i:03}", "name": f"Person{i:04}, Alex", "age": 30, "birthdate": "1990-01-01"}
+        for i in range(3000)
+    ]
+
+    # Every row is its own run, far more runs than files that may be open
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (256, hard))
+    try:
+        sorted_rows, rows_read = sort_csv(reversed(clean_contents), "name", memory_budget=1)
+        sorted_rows = list(sorted_rows)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+    assert [row["name"] for row in sorted_rows] == [row["name"] for row in clean_contents]
+    assert rows_read == 3000
+
+
+def test_main_sort_by(tmp_path, monkeypatch, capsys):
+
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    input_file.write_text(
+        "id,name,age,birthdate\n"
+        "1,Jamie Patel,41,11/02/1984\n"
+        "2,Alex Morgan,29,03/14/1996\n"
+        "3,Nguyen Chris,abc,07/19/2003\n"
+        "4,Alex Morgan,29,03/14/1996\n"
+        "5\n"
+    )
+
+    monkeypatch.setattr(sys, "argv", ["project.py", "--sort-by", "name", str(input_file), str(output_file)])
+    main()
+
+    assert capsys.readouterr().out == "3 discarded row(s)\n"
+    with open(output_file, newline="") as f:
+        assert list(csv.DictReader(f)) == [
+            {"id": "001", "name": "Morgan, Alex", "age": "29", "birthdate": "1996-03-14"},
+            {"id": "002", "name": "Patel, Jamie", "age": "41", "birthdate": "1984-11-02"},
+        ]
+
+    # Header errors still exit
+    input_file.write_text("")
+    with pytest.raises(SystemExit):
+        main()
+
 
 def test_write_csv(tmp_path):
 
@@ -378,7 +646,7 @@ def test_write_csv(tmp_path):
         {"id": "003", "name": "Nguyen, Chris", "age": 22, "birthdate": "2003-07-19"}
     ]
 
-    write_csv(deduplicated_contents, file_path1)
+    assert write_csv(deduplicated_contents, file_path1) == 3
 
     assert file_path1.exists()
 
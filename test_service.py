@@ -0,0 +1,186 @@
+from service import Service, clean_request
+import asyncio
+import pytest
+
+CSV_BODY = (
+    "id,name,age,birthdate\n"
+    "1,Alex Morgan,29,03/14/1996\n"
+    "2,Patel Jamie,abc,11/02/1984\n"
+    "3,Nguyen Chris,22,07/19/2003\n"
+)
+
+
+def test_clean_request():
+
+    # CSV body
+    rows, discarded = clean_request(CSV_BODY.encode(), None, "fast")
+
+    assert rows == [
+        {"id": "001", "name": "Morgan, Alex", "age": 29, "birthdate": "1996-03-14"},
+        {"id": "003", "name": "Chris, Nguyen", "age": 22, "birthdate": "2003-07-19"}
+    ]
+    assert discarded == 1
+
+    # Errors are raised as ValueError instead of exiting
+    with pytest.raises(ValueError):
+        clean_request(b"", None, "fast")
+
+    with pytest.raises(ValueError):
+        clean_request(b"", "missing.csv", "fast")
+
+    # CSV without the required columns
+    with pytest.raises(ValueError, match="Missing column"):
+        clean_request(b"a,b\n1,2\n", None, "fast")
+
+
+def test_clean():
+
+    service = Service(1)
+
+    rows, discarded = asyncio.run(service.clean(CSV_BODY.encode(), {}))
+
+    assert rows == [
+        {"id": "001", "name": "Morgan, Alex", "age": 29, "birthdate": "1996-03-14"},
+        {"id": "002", "name": "Chris, Nguyen", "age": 22, "birthdate": "2003-07-19"}
+    ]
+    assert discarded == 1
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.clean(CSV_BODY.encode(), {"parser": "slow"}))
+
+    # Paths are refused without a root directory
+    with pytest.raises(PermissionError):
+        asyncio.run(service.clean(b"", {"path": "upload.csv"}))
+
+    service.executor.shutdown()
+
+
+def test_clean_path(tmp_path):
+
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "upload.csv").write_text(CSV_BODY)
+    (tmp_path / "secret.csv").write_text(CSV_BODY)
+
+    service = Service(1, root=str(root))
+    rows, discarded = asyncio.run(service.clean(b"", {"path": "upload.csv"}))
+
+    assert len(rows) == 2
+    assert discarded == 1
+
+    # Paths outside the root directory are refused
+    with pytest.raises(PermissionError):
+        asyncio.run(service.clean(b"", {"path": "../secret.csv"}))
+
+    with pytest.raises(PermissionError):
+        asyncio.run(service.clean(b"", {"path": str(tmp_path / "secret.csv")}))
+
+    service.executor.shutdown()
+
+
+def test_clean_shared_dedup():
+
+    service = Service(1, shared_dedup=True)
+
+    rows, discarded = asyncio.run(service.clean(CSV_BODY.encode(), {}))
+    assert len(rows) == 2
+
+    # Every row was seen by the first request
+    with pytest.raises(ValueError):
+        asyncio.run(service.clean(CSV_BODY.encode(), {}))
+
+    service.executor.shutdown()
+
+
+def test_serve():
+
+    async def request(port: int, target: str, body: str, length_header: str = "Content-Length: {length}") -> tuple:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"POST {target} HTTP/1.1\r\n{length_header.format(length=len(body))}\r\n\r\n{body}".encode()
+        )
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, content = response.partition(b"\r\n\r\n")
+        return head.decode(), content.decode()
+
+    async def request_continue(port: int, body: str) -> tuple:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"POST /clean HTTP/1.1\r\nContent-Length: {len(body)}\r\nExpect: 100-continue\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        # The body is only sent after the service asks for it
+        interim = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+        writer.write(body.encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return interim.decode(), response.partition(b"\r\n\r\n")[0].decode()
+
+    async def run() -> list:
+        service = Service(2, max_body=1000)
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            responses = await asyncio.gather(
+                request(port, "/clean", CSV_BODY),
+                request(port, "/clean?parser=regex", CSV_BODY),
+                request(port, "/clean", ""),
+                request(port, "/other", CSV_BODY),
+                request(port, "/clean", CSV_BODY, "Transfer-Encoding: chunked"),
+                request(port, "/clean", CSV_BODY * 20),
+                request_continue(port, CSV_BODY),
+                request(port, "/clean", "a,b\n1,2\n"),
+            )
+        service.executor.shutdown()
+        return responses
+
+    responses = asyncio.run(run())
+    (ok_head, ok_body), (regex_head, _), (empty_head, empty_body), (missing_head, _) = responses[:4]
+    (chunked_head, _), (large_head, _), (continue_head, continue_ok_head), (columns_head, columns_body) = responses[4:]
+
+    # Chunked CSV response
+    assert ok_head.startswith("HTTP/1.1 200 OK")
+    assert "X-Discarded-Rows: 1" in ok_head
+    assert "Morgan, Alex" in ok_body
+    assert ok_body.endswith("0\r\n\r\n")
+    assert regex_head.startswith("HTTP/1.1 200 OK")
+
+    # Errors are returned and the service keeps running
+    assert empty_head.startswith("HTTP/1.1 400 Bad Request")
+    assert "File is empty" in empty_body
+    assert missing_head.startswith("HTTP/1.1 404 Not Found")
+    assert chunked_head.startswith("HTTP/1.1 411 Length Required")
+    assert large_head.startswith("HTTP/1.1 413 Content Too Large")
+    assert columns_head.startswith("HTTP/1.1 400 Bad Request")
+    assert "Missing column(s) ['id', 'name', 'age', 'birthdate']" in columns_body
+
+    # Expect: 100-continue is answered before the body is read
+    assert continue_head == "HTTP/1.1 100 Continue\r\n\r\n"
+    assert continue_ok_head.startswith("HTTP/1.1 200 OK")
+
+
+def test_clean_worker_died():
+
+    service = Service(1)
+    asyncio.run(service.clean(CSV_BODY.encode(), {}))
+
+    # Killing a worker breaks the pool, the next request replaces it
+    broken = service.executor
+    for process in list(broken._processes.values()):
+        process.kill()
+        process.join()
+
+    rows, discarded = asyncio.run(service.clean(CSV_BODY.encode(), {}))
+
+    assert len(rows) == 2
+    assert service.executor is not broken
+
+    rows, discarded = asyncio.run(service.clean(CSV_BODY.encode(), {}))
+
+    assert len(rows) == 2
+
+    service.executor.shutdown()